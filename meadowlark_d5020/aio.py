@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the Meadowlark D5020 project
+#
+# Copyright (c) 2021 Alberto López Sánchez
+# Distributed under the GNU General Public License v3. See LICENSE for more info.
+
+"""
+Asyncio Meadowlark_d5020 module.
+
+It receives an asynchronous connection object. Example::
+
+    from connio import connection_for_url
+    from meadowlark_d5020.aio import Meadowlark_d5020
+
+    async def main():
+        tcp = connection_for_url("tcp://meadowlark_d5020.acme.org:5000")
+        channel = Meadowlark_d5020(1, tcp)
+
+        await channel.set(waveform=1, v1=0, v2=5000, period=1000)
+        print(await channel.read("v2", "lc_temperature"))
+
+    asyncio.run(main())
+
+The parameters are validated and the commands built by
+:class:`meadowlark_d5020.core.Meadowlark_d5020`; only the I/O is done here.
+Each call is a single write (and a single read of all the replies) on the
+connection, which serializes concurrent requests.
+"""
+
+from . import core
+
+
+class Meadowlark_d5020:
+    """Meadowlark_d5020 channel over an asyncio connection"""
+
+    def __init__(self, number: int, conn, journal=None, journal_key=None):
+        self.number = number
+        self._conn = conn
+        # Holds the state and builds the commands: never talks to the device
+        self._channel = core.Meadowlark_d5020(
+            number, None, journal=journal, journal_key=journal_key)
+
+    @property
+    def state(self):
+        """Parameters applied to the channel"""
+        return self._channel.state
+
+    async def _send(self, message):
+        await self._conn.write(message.encode("ascii"))
+
+    async def _query(self, messages):
+        data = "".join(messages).encode("ascii")
+        return await self._conn.write_readlines(data, len(messages))
+
+    async def read(self, *names):
+        """
+        Read several parameters of the channel at once.
+
+        The hardware queries are sent in a single write; the rest of
+        parameters are served from the cached values.
+
+        Returns
+        -------
+        dict
+            parameter name -> value
+        """
+        messages, values = core.batch_read([self._channel], names)
+        replies = await self._query(messages) if messages else []
+        return values(replies)[0]
+
+    async def set(self, **params):
+        """Change several parameters and apply them with a single command"""
+        channel = self._channel
+        state = channel.state
+        try:
+            with channel.hold():
+                for name, value in params.items():
+                    setattr(channel, name, value)
+            await self._send(channel.command())
+        except BaseException:
+            # Not applied: forget the changes
+            channel.state = state
+            raise
+        channel.commit()
+
+    async def set_temperature_setpoint(self, value):
+        await self._send(self._channel.temperature_setpoint_command(value))
+
+    async def toggle_external_input(self):
+        channel = self._channel
+        await self._send("extin:{}\n".format(self.number))
+        channel.state = dict(
+            channel.state, external_input=not channel.external_input)
+        channel.commit()
+
+    async def sync(self, phase, pulse_length):
+        """
+        Produces sync pulse (high-low) on front panel I/O connector of the
+        channel, with this phase, and this length
+        """
+        await self._send(f"sync:{self.number},{phase},{pulse_length}\n")
+
+    async def firmware(self):
+        return (await self._query(["ver:?\n"]))[0]
@@ -23,13 +23,89 @@ It can receive an asynchronous connection object. Example::
     asyncio.run(main())
 """
 
+import functools
+import logging
+import threading
+from contextlib import contextmanager
 from enum import Enum
 from serial import Serial
 
+_log = logging.getLogger(__name__)
+
 
 def clamp(n, smallest, largest): return max(smallest, min(n, largest))
 
 
+def raw_to_celsius(raw): return (int(raw)*500/65535) - 273.15
+
+
+def _send(conn, lock, message):
+    """Write a command that has no reply"""
+    with lock:
+        conn.write(message.encode("ascii"))
+        conn.flush()
+
+
+def _query(conn, lock, messages):
+    """Write all messages at once and read one reply for each of them"""
+    with lock:
+        # Drop any late reply so it is never matched to these queries
+        conn.reset_input_buffer()
+        conn.write("".join(messages).encode("ascii"))
+        conn.flush()
+        return [conn.readline() for _ in messages]
+
+
+def batch_read(channels, names):
+    """
+    Prepare the read of parameters of several channels in a single hardware
+    transaction.
+
+    Parameters
+    ----------
+    channels : list
+        channels (Meadowlark_d5020) to read
+    names : list
+        names of the parameters to read (ex: "v1", "lc_temperature")
+
+    Returns
+    -------
+    messages : list
+        hardware queries to send (all in a single write)
+    values : callable
+        called with the replies to the queries, returns the values of each
+        channel (list of dict parameter name -> value). The parameters that
+        are not queried are served from the cached values.
+    """
+    queries = [(channel, name) for channel in channels
+               for name in names if name in channel.queries]
+    messages = [channel.queries[name].format(channel.number)
+                for channel, name in queries]
+
+    def values(replies):
+        replies = dict(zip(queries, replies))
+        return [
+            {name: raw_to_celsius(replies[(channel, name)])
+             if (channel, name) in replies else getattr(channel, name)
+             for name in names}
+            for channel in channels]
+
+    return messages, values
+
+
+def _rollback(setter):
+    """Restore the cached state if the setter fails to update the device"""
+    @functools.wraps(setter)
+    def wrapper(self, value):
+        state = self.state
+        try:
+            setter(self, value)
+        except BaseException:
+            self.state = state
+            raise
+    return wrapper
+
+
 class Waveform(Enum):
     invariant = 0
     sinusoid = 1
@@ -46,6 +122,8 @@ class Meadowlark_d5020:
     """The central Meadowlark_d5020"""
 
     _conn = None
+    # Serializes write/readline transactions on the shared connection
+    _lock = threading.Lock()
 
     # Min and Max values
     MIN_VOLTAGE = 0
@@ -78,10 +156,29 @@ class Meadowlark_d5020:
         8: "{}:{}\n",  # extin
     }
 
-    def __init__(self, number: int, conn: Serial):
+    # Parameters that have to be queried to the hardware
+    queries = {
+        "lc_temperature": "tmp:{},?\n",
+        "temperature_setpoint": "tsp:{},?\n",
+    }
+
+    def __init__(self, number: int, conn: Serial, journal=None,
+                 journal_key=None, lock=None):
         # Channel number
         self.number = number
-        if Meadowlark_d5020._conn is None:
+        self._journal = journal
+        # Entry of the journal (the channel number unless given)
+        self.journal_key = number if journal_key is None else journal_key
+        self._held = False
+        if lock is not None:
+            # Own connection, shared with other channels through the lock
+            # (ex: channels of a Controller)
+            self._conn = conn
+            self._lock = lock
+        elif conn is None:
+            # No I/O (ex: state holder of the asyncio driver)
+            pass
+        elif Meadowlark_d5020._conn is None:
             Meadowlark_d5020._conn = conn
         else:
             print("Using previous serial connection.")
@@ -100,6 +197,16 @@ class Meadowlark_d5020:
         # Others
         self.__external_input = False
 
+        # Restore the last applied state (without sending it to the device)
+        if journal is not None:
+            state = journal.get(self.journal_key)
+            if state is not None:
+                try:
+                    self.state = state
+                except (KeyError, TypeError, ValueError) as error:
+                    _log.error("ignoring invalid journal entry %r: %r",
+                               self.journal_key, error)
+
     ###########################################################################
 
     @property
@@ -107,8 +214,9 @@ class Meadowlark_d5020:
         return self.__waveform
 
     @waveform.setter
+    @_rollback
     def waveform(self, value: Waveform):
-        self.__waveform = value
+        self.__waveform = Waveform(value).value
         self.update_device()
 
     ###########################################################################
@@ -118,6 +226,7 @@ class Meadowlark_d5020:
         return self.__v1
 
     @v1.setter
+    @_rollback
     def v1(self, value):
         self.__v1 = clamp(value, self.MIN_VOLTAGE, self.MAX_VOLTAGE)
         self.update_device()
@@ -129,6 +238,7 @@ class Meadowlark_d5020:
         return self.__v2
 
     @v2.setter
+    @_rollback
     def v2(self, value):
         self.__v2 = clamp(value, self.MIN_VOLTAGE, self.MAX_VOLTAGE)
         self.update_device()
@@ -140,6 +250,7 @@ class Meadowlark_d5020:
         return self.__period_t
 
     @period.setter
+    @_rollback
     def period(self, value):
         self.__period_t = clamp(value, self.MIN_PERIOD, self.MAX_PERIOD)
         self.update_device()
@@ -151,6 +262,7 @@ class Meadowlark_d5020:
         return self.__phase
 
     @phase.setter
+    @_rollback
     def phase(self, value):
         self.__phase = value % self.MAX_PHASE
         self.update_device()
@@ -162,6 +274,7 @@ class Meadowlark_d5020:
         return self.__duty_cycle
 
     @duty_cycle.setter
+    @_rollback
     def duty_cycle(self, value):
         self.__duty_cycle = clamp(
             value, self.MIN_DUTY_CICLE, self.MAX_DUTY_CICLE)
@@ -174,6 +287,7 @@ class Meadowlark_d5020:
         return self.__tne_voltage
 
     @tne_voltage.setter
+    @_rollback
     def tne_voltage(self, value):
         self.__tne_voltage = clamp(
             value, self.MIN_VOLTAGE, self.MAX_VOLTAGE)
@@ -186,6 +300,7 @@ class Meadowlark_d5020:
         return self.__tne_time
 
     @tne_time.setter
+    @_rollback
     def tne_time(self, value):
         self.__tne_time = clamp(
             value, self.MIN_TNE_TIME, self.MAX_TNE_TIME)
@@ -199,8 +314,9 @@ class Meadowlark_d5020:
 
     def toggle_external_input(self):
         # TODO: Check if sending this command twice disable the external input.
+        self._send("extin:{}\n".format(self.number))
         self.__external_input = not self.__external_input
-        self._conn.write("extin:{}\n".format(self.number).encode('ascii'))
+        self.commit()
 
     ###########################################################################
 
@@ -209,27 +325,126 @@ class Meadowlark_d5020:
         """
         Query current temperature of temperature controlled LC on channel n.
         """
-        self._conn.write(f"tmp:{self.number},?\n")
-        temp = self._conn.readline()
-        return (int(temp)*500/65535) - 273.15
+        return self.read("lc_temperature")["lc_temperature"]
 
     ###########################################################################
 
     @property
     def temperature_setpoint(self):
-        self._conn.write(f"tsp:{self.number},?\n")
-        temp = self._conn.readline()
-        return (int(temp)*500/65535) - 273.15
+        return self.read("temperature_setpoint")["temperature_setpoint"]
 
     @temperature_setpoint.setter
     def temperature_setpoint(self, value: int):
+        self._send(self.temperature_setpoint_command(value))
+
+    def temperature_setpoint_command(self, value):
         value = clamp(value, 0, 65535)
         value = (value + 273.15) * 65535/500
-        self._conn.write(f"tsp:{self.number},{value}\n")
+        return f"tsp:{self.number},{value}\n"
 
     ###########################################################################
 
+    @property
+    def state(self):
+        """Parameters applied to the channel"""
+        return {
+            "waveform": self.__waveform,
+            "v1": self.__v1,
+            "v2": self.__v2,
+            "period": self.__period_t,
+            "phase": self.__phase,
+            "duty_cycle": self.__duty_cycle,
+            "tne_voltage": self.__tne_voltage,
+            "tne_time": self.__tne_time,
+            "external_input": self.__external_input,
+        }
+
+    @state.setter
+    def state(self, state):
+        # Only updates the cache: nothing is sent to the device. All values
+        # are validated first, so an invalid state changes nothing.
+        state = dict(self.state, **state)
+        if not isinstance(state["external_input"], bool):
+            raise TypeError("external_input must be a bool")
+        waveform = Waveform(state["waveform"]).value
+        v1 = clamp(int(state["v1"]), self.MIN_VOLTAGE, self.MAX_VOLTAGE)
+        v2 = clamp(int(state["v2"]), self.MIN_VOLTAGE, self.MAX_VOLTAGE)
+        period_t = clamp(
+            int(state["period"]), self.MIN_PERIOD, self.MAX_PERIOD)
+        phase = int(state["phase"]) % self.MAX_PHASE
+        duty_cycle = clamp(int(state["duty_cycle"]),
+                           self.MIN_DUTY_CICLE, self.MAX_DUTY_CICLE)
+        tne_voltage = clamp(
+            int(state["tne_voltage"]), self.MIN_VOLTAGE, self.MAX_VOLTAGE)
+        tne_time = clamp(
+            int(state["tne_time"]), self.MIN_TNE_TIME, self.MAX_TNE_TIME)
+        self.__waveform = waveform
+        self.__v1 = v1
+        self.__v2 = v2
+        self.__period_t = period_t
+        self.__phase = phase
+        self.__duty_cycle = duty_cycle
+        self.__tne_voltage = tne_voltage
+        self.__tne_time = tne_time
+        self.__external_input = state["external_input"]
+
+    def commit(self):
+        """Record the state of the channel in its journal (if any)"""
+        if self._journal is not None:
+            self._journal.commit({self.journal_key: self.state})
+
+    def _send(self, message):
+        _send(self._conn, self._lock, message)
+
+    def _query(self, messages):
+        return _query(self._conn, self._lock, messages)
+
+    def read(self, *names):
+        """
+        Read several parameters of the channel at once.
+
+        All the hardware queries (temperature, setpoint) are sent in a single
+        write and their replies read back in order, so the whole read costs
+        one serial exchange. The rest of parameters are served from the
+        cached values.
+
+        Parameters
+        ----------
+        names : str
+            names of the parameters to read (ex: "v1", "lc_temperature")
+
+        Returns
+        -------
+        dict
+            parameter name -> value
+        """
+        messages, values = batch_read([self], names)
+        replies = self._query(messages) if messages else []
+        return values(replies)[0]
+
+    @contextmanager
+    def hold(self):
+        """
+        Change parameters without updating the device.
+
+        Inside this block the setters only update the cache. Call
+        :meth:`update_device` afterwards to apply all the changes with a
+        single command.
+        """
+        self._held = True
+        try:
+            yield self
+        finally:
+            self._held = False
+
     def update_device(self):
+        if self._held:
+            return
+        self._send(self.command())
+        self.commit()
+
+    def command(self):
+        """Command applying the cached parameters to the channel"""
         w = self.dict_waveform[self.__waveform]
         n = self.number
         v1 = self.__v1
@@ -241,9 +456,8 @@ class Meadowlark_d5020:
         tt = self.__tne_time
 
         # TODO: Check if the device ignores the unused parameters.
-        message = self.command_waveform[self.__waveform].format(
+        return self.command_waveform[self.__waveform].format(
             w, n, v1, v2, t, ph, dc, tv, tt)
-        self._conn.write(message.encode("ascii"))
 
     def sync(self, phase, pulse_length):
         """
@@ -257,9 +471,98 @@ class Meadowlark_d5020:
         pulse_length: int
             pulse length in microseconds
         """
-        self._conn.write(f"sync:{self.number},{phase},{pulse_length}\n")
+        self._send(f"sync:{self.number},{phase},{pulse_length}\n")
 
     @property
     def firmware(self):
-        self._conn.write("ver:?\n")
-        return self._conn.readline()
+        return self._query(["ver:?\n"])[0]
+
+
+class Controller:
+    """
+    All the channels of a Meadowlark D5020 controller.
+
+    Parameters are read and written for all channels at once, each
+    operation being a single hardware transaction.
+
+    Unlike standalone channels, the channels of a controller use the
+    controller connection, so several controllers can be driven from the
+    same process. Their journal entries are prefixed with *name* (ex: the
+    controller URL) when given.
+    """
+
+    def __init__(self, conn: Serial, channels=(1, 2, 3, 4), journal=None,
+                 name=None):
+        self._conn = conn
+        self._lock = threading.Lock()
+        self._journal = journal
+        self.channels = [
+            Meadowlark_d5020(
+                number, conn, journal=journal, lock=self._lock,
+                journal_key=None if name is None else "{}:{}".format(
+                    name, number))
+            for number in channels]
+
+    def _send(self, message):
+        _send(self._conn, self._lock, message)
+
+    def _query(self, messages):
+        return _query(self._conn, self._lock, messages)
+
+    def read(self, *names):
+        """
+        Read several parameters of all channels at once.
+
+        Returns
+        -------
+        dict
+            parameter name -> list of values (one per channel)
+        """
+        messages, values = batch_read(self.channels, names)
+        replies = self._query(messages) if messages else []
+        channel_values = values(replies)
+        return {name: [channel[name] for channel in channel_values]
+                for name in names}
+
+    def write(self, name, values):
+        """
+        Set a parameter of all channels with a single write.
+
+        Parameters
+        ----------
+        name : str
+            parameter name (ex: "v1")
+        values : sequence
+            one value per channel
+        """
+        if len(values) != len(self.channels):
+            raise ValueError(
+                "expected {} values for {!r} (got {})".format(
+                    len(self.channels), name, len(values)))
+        # Tango spectrum attributes come as numpy arrays
+        if not self.channels:
+            return
+        if name == "temperature_setpoint":
+            values = [float(value) for value in values]
+            self._send("".join(
+                channel.temperature_setpoint_command(value)
+                for channel, value in zip(self.channels, values)))
+            return
+        values = [int(value) for value in values]
+        states = [channel.state for channel in self.channels]
+        try:
+            messages = []
+            for channel, value in zip(self.channels, values):
+                with channel.hold():
+                    setattr(channel, name, value)
+                messages.append(channel.command())
+            self._send("".join(messages))
+        except BaseException:
+            # Not applied: forget the changes
+            for channel, state in zip(self.channels, states):
+                channel.state = state
+            raise
+        if self._journal is not None:
+            self._journal.commit(
+                {channel.journal_key: channel.state
+                 for channel in self.channels})
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the Meadowlark D5020 project
+#
+# Copyright (c) 2021 Alberto López Sánchez
+# Distributed under the GNU General Public License v3. See LICENSE for more info.
+
+"""
+Journal of the last state applied to each channel.
+
+The state of every channel is kept in a small JSON file so that, after a
+restart, the driver can restore its cache without sending anything to the
+hardware. Example::
+
+    from meadowlark_d5020.core import Meadowlark_d5020
+    from meadowlark_d5020.journal import journal_for_path
+
+    journal = journal_for_path("/var/lib/meadowlark_d5020/d5020.json")
+    channel = Meadowlark_d5020(1, conn, journal=journal)
+
+Several processes may share the same file: each commit re-reads it and
+merges its changes under a file lock (on platforms with :mod:`fcntl`), so
+the entries of other processes are kept. Entries that are not a JSON
+object are ignored when loading.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+_log = logging.getLogger(__name__)
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+class Journal:
+    """Channel states persisted in a JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._states = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path) as fobj:
+                states = json.load(fobj)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            _log.error("could not load journal %s: %s", self.path, error)
+            return {}
+        if not isinstance(states, dict):
+            _log.error("could not load journal %s: not a JSON object",
+                       self.path)
+            return {}
+        invalid = [key for key, state in states.items()
+                   if not isinstance(state, dict)]
+        for key in invalid:
+            _log.error("ignoring invalid entry %r of journal %s",
+                       key, self.path)
+            del states[key]
+        return states
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive access to the file among processes"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.path + ".lock", "a") as fobj:
+            fcntl.flock(fobj, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fobj, fcntl.LOCK_UN)
+
+    def get(self, key):
+        """Last state committed for the journal key (None if unknown)"""
+        with self._lock:
+            state = self._states.get(str(key))
+            return None if state is None else dict(state)
+
+    def commit(self, states):
+        """
+        Record the state of one or more channels.
+
+        The file is only rewritten if something changed. It is re-read and
+        merged first, so the entries written by other processes are kept,
+        and replaced atomically so a crash never leaves a partially written
+        journal.
+
+        Parameters
+        ----------
+        states : dict
+            journal key -> state (dict of parameter name -> value)
+        """
+        with self._lock:
+            changes = {str(key): dict(state)
+                       for key, state in states.items()
+                       if self._states.get(str(key)) != state}
+            if not changes:
+                return
+            with self._file_lock():
+                states = dict(self._load(), **changes)
+                self._dump(states)
+            # only once the file is replaced, so a failed dump is retried
+            self._states = states
+
+    def _dump(self, states):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".journal-")
+        try:
+            with os.fdopen(fd, "w") as fobj:
+                json.dump(states, fobj, sort_keys=True)
+                fobj.flush()
+                os.fsync(fobj.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+
+def journal_for_path(path):
+    """Journal for the given file, shared by all channels of the process"""
+    path = os.path.abspath(path)
+    with _journals_lock:
+        journal = _journals.get(path)
+        if journal is None:
+            journal = _journals[path] = Journal(path)
+        return journal
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the Meadowlark D5020 project
+#
+# Copyright (c) 2021 Alberto López Sánchez
+# Distributed under the GNU General Public License v3. See LICENSE for more info.
+
+"""
+Values reported by the simulator.
+
+Kept apart from :mod:`meadowlark_d5020.simulator` so that clients checking
+the replies (e.g. ``utils/stress.py``) do not need sinstruments.
+"""
+
+# Channels with distinct, non overlapping temperatures and setpoints
+MAX_CHANNEL = 99
+
+
+def celsius_to_raw(value): return round((value + 273.15) * 65535/500)
+
+
+def temperature(channel):
+    """Simulated LC temperature (ºC) of the channel: 20 to 69.5"""
+    return 20.0 + channel / 2
+
+
+def temperature_setpoint(channel):
+    """Initial temperature setpoint (ºC) of the channel: 100 to 149.5"""
+    return 100.0 + channel / 2
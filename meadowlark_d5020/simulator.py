@@ -18,15 +18,52 @@
 A simple *nc* client can be used to connect to the instrument:
 
     $ nc 0 5000
-    *IDN?
-    GE,Pace5000,204683,1.01A
+    tmp:1,?
+    38489
+
+Each channel reports a fixed temperature (see
+:mod:`meadowlark_d5020.simulated`) so that a client can check that every
+reply belongs to the channel it queried.
 """
 
 from sinstruments.simulator import BaseDevice
 
+from .simulated import (  # noqa: F401
+    MAX_CHANNEL, celsius_to_raw, temperature, temperature_setpoint)
+
+FIRMWARE = b"D5020 simulator 1.0\n"
+
 
 class Meadowlark_d5020(BaseDevice):
 
+    def __init__(self, name, **kwargs):
+        super().__init__(name, **kwargs)
+        self.channels = {}
+
+    def channel(self, number):
+        channel = self.channels.get(number)
+        if channel is None:
+            channel = self.channels[number] = {
+                "tmp": celsius_to_raw(temperature(number)),
+                "tsp": celsius_to_raw(temperature_setpoint(number)),
+            }
+        return channel
+
     def handle_message(self, line):
-        print("RECV:", line)
-        pass
+        line = line.strip().decode("ascii")
+        self._log.debug("RECV: %r", line)
+        cmd, _, args = line.partition(":")
+        args = args.split(",")
+        if cmd == "ver":
+            return FIRMWARE
+        try:
+            channel = self.channel(int(args[0]))
+            if cmd in ("tmp", "tsp"):
+                if args[1] == "?":
+                    return "{}\n".format(channel[cmd]).encode("ascii")
+                channel[cmd] = int(float(args[1]))
+            else:
+                # waveform, extin and sync commands have no reply
+                channel[cmd] = args[1:]
+        except (ValueError, IndexError):
+            self._log.warning("unknown command: %r", line)
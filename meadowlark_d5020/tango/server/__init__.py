@@ -8,6 +8,7 @@
 """Tango server module for Meadowlark D5020."""
 
 from .meadowlark_d5020 import Meadowlark_d5020
+from .meadowlark_d5020_controller import Meadowlark_d5020_Controller
 
 
 def main():
@@ -17,4 +18,18 @@ def main():
     args = ['Meadowlark_d5020'] + sys.argv[1:]
     fmt = '%(asctime)s %(threadName)s %(levelname)s %(name)s %(message)s'
     logging.basicConfig(level=logging.INFO, format=fmt)
-    tango.server.run((Meadowlark_d5020,), args=args)
+    tango.server.run(
+        (Meadowlark_d5020, Meadowlark_d5020_Controller), args=args)
+
+
+def main_asyncio():
+    import sys
+    import logging
+    import tango.server
+    from .aio import Meadowlark_d5020_Asyncio
+    args = ['Meadowlark_d5020_asyncio'] + sys.argv[1:]
+    fmt = '%(asctime)s %(threadName)s %(levelname)s %(name)s %(message)s'
+    logging.basicConfig(level=logging.INFO, format=fmt)
+    tango.server.run(
+        (Meadowlark_d5020_Asyncio,), args=args,
+        green_mode=tango.GreenMode.Asyncio)
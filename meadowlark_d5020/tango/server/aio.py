@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the Meadowlark D5020 project
+#
+# Copyright (c) 2021 Alberto López Sánchez
+# Distributed under the GNU General Public License v3. See LICENSE for more info.
+
+"""
+Asyncio Tango server class for Meadowlark_d5020.
+
+All devices of the server run in a single event loop and share one
+connection per URL, so a server process can host many controllers.
+"""
+
+from connio import connection_for_url
+from tango import GreenMode
+from tango.server import attribute, command, device_property
+
+from meadowlark_d5020.aio import Meadowlark_d5020 as D5020
+from meadowlark_d5020.core import Meadowlark_d5020 as CoreD5020
+from meadowlark_d5020.core import Waveform
+
+from .base import Meadowlark_d5020_Base
+
+_connections = {}
+
+
+def connection(url):
+    """Asyncio connection for the URL, shared by all devices of the server"""
+    if "://" not in url:
+        url = "serial://" + url
+    conn = _connections.get(url)
+    if conn is None:
+        conn = _connections[url] = connection_for_url(url)
+    return conn
+
+
+class Meadowlark_d5020_Asyncio(Meadowlark_d5020_Base):
+
+    green_mode = GreenMode.Asyncio
+
+    channel = device_property(dtype=int)
+
+    async def init_device(self):
+        await super().init_device()
+        self.meadowlark_d5020 = D5020(
+            self.channel, connection(self.url), journal=self.open_journal(),
+            journal_key="{}:{}".format(self.url, self.channel))
+
+    async def read_attr_hardware(self, attr_list):
+        self.set_snapshot(
+            await self.meadowlark_d5020.read(*self.requested(attr_list)))
+
+    async def _read(self, name):
+        value = self.pop_snapshot(name)
+        if value is None:
+            value = (await self.meadowlark_d5020.read(name))[name]
+        return value
+
+    ###########################################################################
+
+    @attribute(dtype=Waveform, label="Waveform pattern")
+    async def waveform(self):
+        return await self._read("waveform")
+
+    @waveform.setter
+    async def set_waveform(self, value):
+        await self.meadowlark_d5020.set(waveform=value)
+
+    ###########################################################################
+
+    @attribute(dtype=int, unit="mV", label="V1",
+               min_value=CoreD5020.MIN_VOLTAGE,
+               max_value=CoreD5020.MAX_VOLTAGE, doc="v1")
+    async def v1(self):
+        return await self._read("v1")
+
+    @v1.setter
+    async def set_v1(self, value):
+        await self.meadowlark_d5020.set(v1=value)
+
+    ###########################################################################
+
+    @attribute(dtype=int, unit="mV", label="V2",
+               min_value=CoreD5020.MIN_VOLTAGE,
+               max_value=CoreD5020.MAX_VOLTAGE, doc="v2")
+    async def v2(self):
+        return await self._read("v2")
+
+    @v2.setter
+    async def set_v2(self, value):
+        await self.meadowlark_d5020.set(v2=value)
+
+    ###########################################################################
+
+    @attribute(dtype=int, unit="ms", label="period",
+               min_value=CoreD5020.MIN_PERIOD,
+               max_value=CoreD5020.MAX_PERIOD, doc="period")
+    async def period(self):
+        return await self._read("period")
+
+    @period.setter
+    async def set_period(self, value):
+        await self.meadowlark_d5020.set(period=value)
+
+    ###########################################################################
+
+    @attribute(dtype=int, unit="degrees", label="phase",
+               min_value=-CoreD5020.MAX_PHASE,
+               max_value=CoreD5020.MAX_PHASE, doc="phase")
+    async def phase(self):
+        return await self._read("phase")
+
+    @phase.setter
+    async def set_phase(self, value):
+        await self.meadowlark_d5020.set(phase=value)
+
+    ###########################################################################
+
+    @attribute(dtype=int, unit="%", label="duty cycle",
+               min_value=CoreD5020.MIN_DUTY_CICLE,
+               max_value=CoreD5020.MAX_DUTY_CICLE, doc="duty cycle")
+    async def duty_cycle(self):
+        return await self._read("duty_cycle")
+
+    @duty_cycle.setter
+    async def set_duty_cycle(self, value):
+        await self.meadowlark_d5020.set(duty_cycle=value)
+
+    ###########################################################################
+
+    @attribute(dtype=int, unit="mV", label="Transient Nematic Effect Voltage",
+               min_value=CoreD5020.MIN_VOLTAGE,
+               max_value=CoreD5020.MAX_VOLTAGE, doc="T.N.E Voltage")
+    async def tne_voltage(self):
+        return await self._read("tne_voltage")
+
+    @tne_voltage.setter
+    async def set_tne_voltage(self, value):
+        await self.meadowlark_d5020.set(tne_voltage=value)
+
+    ###########################################################################
+
+    @attribute(dtype=int, unit="ms", label="Transient Nematic Effect Time",
+               min_value=CoreD5020.MIN_TNE_TIME,
+               max_value=CoreD5020.MAX_TNE_TIME, doc="T.N.E Time")
+    async def tne_time(self):
+        return await self._read("tne_time")
+
+    @tne_time.setter
+    async def set_tne_time(self, value):
+        await self.meadowlark_d5020.set(tne_time=value)
+
+    ###########################################################################
+
+    @attribute(dtype=float, unit="ºC", label="LC Temperature",
+               doc="Query current temperature of temperature controlled LC on "
+               "channel n.")
+    async def lc_temperature(self):
+        return await self._read("lc_temperature")
+
+    ###########################################################################
+
+    @attribute(dtype=float, unit="ºC", label="Temperature Setpoint",
+               min_value=0.0, max_value=226.0)
+    async def temperature_setpoint(self):
+        return await self._read("temperature_setpoint")
+
+    @temperature_setpoint.setter
+    async def set_temperature_setpoint(self, value):
+        await self.meadowlark_d5020.set_temperature_setpoint(value)
+
+    ###########################################################################
+
+    @command(dtype_in=(int,), doc_in="[phase (degrees), pulse length (us)]",
+             doc="Produce a sync pulse on the front panel I/O connector")
+    async def sync(self, args):
+        phase, pulse_length = args
+        await self.meadowlark_d5020.sync(phase, pulse_length)
+
+    ###########################################################################
+
+
+if __name__ == "__main__":
+    import logging
+    fmt = "%(asctime)s %(levelname)s %(name)s %(message)s"
+    logging.basicConfig(level="DEBUG", format=fmt)
+    Meadowlark_d5020_Asyncio.run_server()
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the Meadowlark D5020 project
+#
+# Copyright (c) 2021 Alberto López Sánchez
+# Distributed under the GNU General Public License v3. See LICENSE for more info.
+
+"""Common base of the Meadowlark D5020 tango server classes"""
+
+from tango.server import Device, device_property
+
+from meadowlark_d5020.core import Meadowlark_d5020 as D5020
+from meadowlark_d5020.journal import journal_for_path
+
+
+class Meadowlark_d5020_Base(Device):
+    """
+    Properties and read snapshot shared by the Meadowlark D5020 classes.
+
+    The subclasses implement ``read_attr_hardware`` by reading all the
+    :meth:`requested` attributes in a single hardware transaction and
+    storing the values with :meth:`set_snapshot`. The attribute readers then
+    take their value with :meth:`pop_snapshot`.
+    """
+
+    url = device_property(dtype=str)
+    journal = device_property(
+        dtype=str, default_value="",
+        doc="file where the last applied state is kept (empty to disable)")
+
+    def open_journal(self):
+        return journal_for_path(self.journal) if self.journal else None
+
+    def requested(self, attr_list):
+        """Names of the requested attributes handled by the driver"""
+        multi_attr = self.get_device_attr()
+        names = [multi_attr.get_attr_by_ind(i).get_name() for i in attr_list]
+        # Skip State, Status and the attributes of the device itself
+        return [name for name in names if hasattr(D5020, name)]
+
+    def set_snapshot(self, values):
+        self._snapshot = values
+
+    def pop_snapshot(self, name):
+        """Value read for the current request (None if it was not read)"""
+        return getattr(self, "_snapshot", {}).pop(name, None)
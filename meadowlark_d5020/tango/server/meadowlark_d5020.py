@@ -7,28 +7,41 @@
 
 """Tango server class for Meadowlark_d5020"""
 
-import serial
-from tango.server import Device, attribute, command, device_property
+from tango.server import attribute, device_property
 
 from meadowlark_d5020.core import Meadowlark_d5020 as D5020
 from meadowlark_d5020.core import Waveform
+from meadowlark_d5020.transport import serial_for_url
 
+from .base import Meadowlark_d5020_Base
 
-class Meadowlark_d5020(Device):
 
-    url = device_property(dtype=str)
+class Meadowlark_d5020(Meadowlark_d5020_Base):
+
     channel = device_property(dtype=int)
 
     def init_device(self):
         super().init_device()
-        conn = serial.serial_for_url(self.url)
-        self.meadowlark_d5020 = D5020(self.channel, conn)
+        conn = serial_for_url(self.url)
+        self.meadowlark_d5020 = D5020(
+            self.channel, conn, journal=self.open_journal(),
+            journal_key="{}:{}".format(self.url, self.channel))
+
+    def read_attr_hardware(self, attr_list):
+        self.set_snapshot(
+            self.meadowlark_d5020.read(*self.requested(attr_list)))
+
+    def _read(self, name):
+        value = self.pop_snapshot(name)
+        if value is None:
+            value = self.meadowlark_d5020.read(name)[name]
+        return value
 
     ###########################################################################
 
     @attribute(dtype=Waveform, label="Waveform pattern")
     def waveform(self):
-        return self.meadowlark_d5020.waveform
+        return self._read("waveform")
 
     @waveform.setter
     def set_waveform(self, value):
@@ -39,7 +52,7 @@ class Meadowlark_d5020(Device):
     @attribute(dtype=int, unit="mV", label="V1", min_value=D5020.MIN_VOLTAGE, 
             max_value=D5020.MAX_VOLTAGE, doc="v1")
     def v1(self):
-        return self.meadowlark_d5020.v1
+        return self._read("v1")
 
     @v1.setter
     def set_v1(self, value):
@@ -50,7 +63,7 @@ class Meadowlark_d5020(Device):
     @attribute(dtype=int, unit="mV", label="V2", min_value=D5020.MIN_VOLTAGE, 
                max_value=D5020.MAX_VOLTAGE, doc="v2")
     def v2(self):
-        return self.meadowlark_d5020.v2
+        return self._read("v2")
 
     @v2.setter
     def set_v2(self, value):
@@ -61,7 +74,7 @@ class Meadowlark_d5020(Device):
     @attribute(dtype=int, unit="ms", label="period", min_value=D5020.MIN_PERIOD,
                max_value=D5020.MAX_PERIOD, doc="period")
     def period(self):
-        return self.meadowlark_d5020.period
+        return self._read("period")
 
     @period.setter
     def set_period(self, value):
@@ -73,7 +86,7 @@ class Meadowlark_d5020(Device):
                min_value=-D5020.MAX_PHASE, max_value=D5020.MAX_PHASE, 
                doc="phase")
     def phase(self):
-        return self.meadowlark_d5020.phase
+        return self._read("phase")
 
     @phase.setter
     def set_phase(self, value):
@@ -85,7 +98,7 @@ class Meadowlark_d5020(Device):
                min_value=D5020.MIN_DUTY_CICLE, max_value=D5020.MAX_DUTY_CICLE,
                doc="duty cycle")
     def duty_cycle(self):
-        return self.meadowlark_d5020.duty_cycle
+        return self._read("duty_cycle")
 
     @duty_cycle.setter
     def set_duty_cycle(self, value):
@@ -97,7 +110,7 @@ class Meadowlark_d5020(Device):
                min_value=D5020.MIN_VOLTAGE, 
                max_value=D5020.MAX_VOLTAGE, doc="T.N.E Voltage")
     def tne_voltage(self):
-        return self.meadowlark_d5020.tne_voltage
+        return self._read("tne_voltage")
 
     @tne_voltage.setter
     def set_tne_voltage(self, value):
@@ -109,7 +122,7 @@ class Meadowlark_d5020(Device):
                min_value=D5020.MIN_TNE_TIME, max_value=D5020.MAX_TNE_TIME, 
                doc="T.N.E Time")
     def tne_time(self):
-        return self.meadowlark_d5020.tne_time
+        return self._read("tne_time")
 
     @tne_time.setter
     def set_tne_time(self, value):
@@ -117,18 +130,18 @@ class Meadowlark_d5020(Device):
 
     ###########################################################################
 
-    @attribute(dtype=bool, unit="ºC", label="LC Temperature",
+    @attribute(dtype=float, unit="ºC", label="LC Temperature",
                doc="Query current temperature of temperature controlled LC on "
                "channel n.")
     def lc_temperature(self):
-        return self.meadowlark_d5020.lc_temperature()
+        return self._read("lc_temperature")
 
     ###########################################################################
 
     @attribute(dtype=float, unit="ºC", label="Temperature Setpoint",
                min_value=0.0, max_value=226.0)
     def temperature_setpoint(self):
-        return self.meadowlark_d5020.temperature_setpoint()
+        return self._read("temperature_setpoint")
 
     @temperature_setpoint.setter
     def set_temperature_setpoint(self, value):
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the Meadowlark D5020 project
+#
+# Copyright (c) 2021 Alberto López Sánchez
+# Distributed under the GNU General Public License v3. See LICENSE for more info.
+
+"""Tango server class for a whole Meadowlark D5020 controller"""
+
+from tango.server import attribute, device_property
+
+from meadowlark_d5020.core import Controller
+from meadowlark_d5020.core import Meadowlark_d5020 as D5020
+from meadowlark_d5020.transport import serial_for_url
+
+from .base import Meadowlark_d5020_Base
+
+# Maximum number of channels exposed by the spectrum attributes
+MAX_CHANNELS = 16
+
+
+class Meadowlark_d5020_Controller(Meadowlark_d5020_Base):
+    """All channels of a controller as spectrum attributes indexed by channel"""
+
+    channels = device_property(dtype=(int,), default_value=[1, 2, 3, 4])
+
+    def init_device(self):
+        super().init_device()
+        conn = serial_for_url(self.url)
+        self.controller = Controller(
+            conn, self.channels, journal=self.open_journal(), name=self.url)
+
+    def read_attr_hardware(self, attr_list):
+        self.set_snapshot(self.controller.read(*self.requested(attr_list)))
+
+    def _read(self, name):
+        value = self.pop_snapshot(name)
+        if value is None:
+            value = self.controller.read(name)[name]
+        return value
+
+    ###########################################################################
+
+    @attribute(dtype=(int,), max_dim_x=MAX_CHANNELS, label="Channels",
+               doc="channel number of each position of the other attributes")
+    def channel(self):
+        return [channel.number for channel in self.controller.channels]
+
+    ###########################################################################
+
+    @attribute(dtype=(int,), max_dim_x=MAX_CHANNELS, label="Waveform pattern",
+               doc="waveform number (see meadowlark_d5020.core.Waveform)")
+    def waveform(self):
+        return self._read("waveform")
+
+    @waveform.setter
+    def set_waveform(self, value):
+        self.controller.write("waveform", value)
+
+    ###########################################################################
+
+    @attribute(dtype=(int,), max_dim_x=MAX_CHANNELS, unit="mV", label="V1",
+               min_value=D5020.MIN_VOLTAGE, max_value=D5020.MAX_VOLTAGE,
+               doc="v1")
+    def v1(self):
+        return self._read("v1")
+
+    @v1.setter
+    def set_v1(self, value):
+        self.controller.write("v1", value)
+
+    ###########################################################################
+
+    @attribute(dtype=(int,), max_dim_x=MAX_CHANNELS, unit="mV", label="V2",
+               min_value=D5020.MIN_VOLTAGE, max_value=D5020.MAX_VOLTAGE,
+               doc="v2")
+    def v2(self):
+        return self._read("v2")
+
+    @v2.setter
+    def set_v2(self, value):
+        self.controller.write("v2", value)
+
+    ###########################################################################
+
+    @attribute(dtype=(int,), max_dim_x=MAX_CHANNELS, unit="ms",
+               label="period", min_value=D5020.MIN_PERIOD,
+               max_value=D5020.MAX_PERIOD, doc="period")
+    def period(self):
+        return self._read("period")
+
+    @period.setter
+    def set_period(self, value):
+        self.controller.write("period", value)
+
+    ###########################################################################
+
+    @attribute(dtype=(int,), max_dim_x=MAX_CHANNELS, unit="degrees",
+               label="phase", min_value=-D5020.MAX_PHASE,
+               max_value=D5020.MAX_PHASE, doc="phase")
+    def phase(self):
+        return self._read("phase")
+
+    @phase.setter
+    def set_phase(self, value):
+        self.controller.write("phase", value)
+
+    ###########################################################################
+
+    @attribute(dtype=(int,), max_dim_x=MAX_CHANNELS, unit="%",
+               label="duty cycle", min_value=D5020.MIN_DUTY_CICLE,
+               max_value=D5020.MAX_DUTY_CICLE, doc="duty cycle")
+    def duty_cycle(self):
+        return self._read("duty_cycle")
+
+    @duty_cycle.setter
+    def set_duty_cycle(self, value):
+        self.controller.write("duty_cycle", value)
+
+    ###########################################################################
+
+    @attribute(dtype=(int,), max_dim_x=MAX_CHANNELS, unit="mV",
+               label="Transient Nematic Effect Voltage",
+               min_value=D5020.MIN_VOLTAGE, max_value=D5020.MAX_VOLTAGE,
+               doc="T.N.E Voltage")
+    def tne_voltage(self):
+        return self._read("tne_voltage")
+
+    @tne_voltage.setter
+    def set_tne_voltage(self, value):
+        self.controller.write("tne_voltage", value)
+
+    ###########################################################################
+
+    @attribute(dtype=(int,), max_dim_x=MAX_CHANNELS, unit="ms",
+               label="Transient Nematic Effect Time",
+               min_value=D5020.MIN_TNE_TIME, max_value=D5020.MAX_TNE_TIME,
+               doc="T.N.E Time")
+    def tne_time(self):
+        return self._read("tne_time")
+
+    @tne_time.setter
+    def set_tne_time(self, value):
+        self.controller.write("tne_time", value)
+
+    ###########################################################################
+
+    @attribute(dtype=(bool,), max_dim_x=MAX_CHANNELS, label="External input")
+    def external_input(self):
+        return self._read("external_input")
+
+    ###########################################################################
+
+    @attribute(dtype=(float,), max_dim_x=MAX_CHANNELS, unit="ºC",
+               label="LC Temperature",
+               doc="Current temperature of temperature controlled LC of each "
+               "channel.")
+    def lc_temperature(self):
+        return self._read("lc_temperature")
+
+    ###########################################################################
+
+    @attribute(dtype=(float,), max_dim_x=MAX_CHANNELS, unit="ºC",
+               label="Temperature Setpoint", min_value=0.0, max_value=226.0)
+    def temperature_setpoint(self):
+        return self._read("temperature_setpoint")
+
+    @temperature_setpoint.setter
+    def set_temperature_setpoint(self, value):
+        self.controller.write("temperature_setpoint", value)
+
+    ###########################################################################
+
+
+if __name__ == "__main__":
+    import logging
+    fmt = "%(asctime)s %(levelname)s %(name)s %(message)s"
+    logging.basicConfig(level="DEBUG", format=fmt)
+    Meadowlark_d5020_Controller.run_server()
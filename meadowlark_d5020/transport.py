@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+#
+# This file is part of the Meadowlark D5020 project
+#
+# Copyright (c) 2021 Alberto López Sánchez
+# Distributed under the GNU General Public License v3. See LICENSE for more info.
+
+"""
+Network transport for controllers behind a terminal server (ex: Moxa).
+
+It exposes the subset of the :class:`serial.Serial` API used by
+:class:`meadowlark_d5020.core.Meadowlark_d5020` (``write``, ``flush``,
+``readline``) over a persistent TCP connection with TCP_NODELAY and
+keepalive enabled. Writes are coalesced and sent in a single packet on
+``flush`` (or before waiting for a reply in ``readline``). Example::
+
+    from meadowlark_d5020.core import Meadowlark_d5020
+    from meadowlark_d5020.transport import serial_for_url
+
+    conn = serial_for_url("rfc2217://dbl16ctmoxa01:4001")
+    channel = Meadowlark_d5020(1, conn)
+    print(channel.lc_temperature)
+
+``rfc2217://`` URLs are served with a minimal telnet layer which refuses
+every option the terminal server proposes, so no serial port settings are
+negotiated: the port parameters must be configured on the terminal server.
+"""
+
+import select
+import socket
+import time
+import urllib.parse
+
+import serial
+
+# Telnet protocol (RFC 854)
+IAC = 255
+DONT = 254
+DO = 253
+WONT = 252
+WILL = 251
+SB = 250
+SE = 240
+
+
+class TCP:
+    """Persistent raw TCP connection with the serial-like API of the core"""
+
+    def __init__(self, host, port, timeout=1.0, connection_timeout=1.0,
+                 telnet=False, keepalive=True):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.connection_timeout = connection_timeout
+        self.telnet = telnet
+        self.keepalive = keepalive
+        self._sock = None
+        self._wbuf = bytearray()
+        self._rbuf = bytearray()
+        self._telnet_buf = bytearray()
+
+    def __repr__(self):
+        scheme = "rfc2217" if self.telnet else "tcp"
+        return "{}({}://{}:{})".format(
+            type(self).__name__, scheme, self.host, self.port)
+
+    @property
+    def is_open(self):
+        return self._sock is not None
+
+    def open(self):
+        if self._sock is not None:
+            return
+        sock = socket.create_connection(
+            (self.host, self.port), timeout=self.connection_timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        if self.keepalive:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # Detect a dead terminal server in seconds instead of hours
+            for option, value in (("TCP_KEEPIDLE", 10), ("TCP_KEEPINTVL", 2),
+                                  ("TCP_KEEPCNT", 3)):
+                if hasattr(socket, option):
+                    sock.setsockopt(
+                        socket.IPPROTO_TCP, getattr(socket, option), value)
+        sock.settimeout(self.timeout)
+        self._sock = sock
+        self._rbuf.clear()
+        self._telnet_buf.clear()
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+    def reset_input_buffer(self):
+        self._rbuf.clear()
+
+    def write(self, data):
+        self._wbuf += data
+        return len(data)
+
+    def flush(self):
+        """Send all the pending writes in a single packet"""
+        if not self._wbuf:
+            return
+        data = bytes(self._wbuf)
+        if self.telnet:
+            data = data.replace(b"\xff", b"\xff\xff")
+        self._wbuf.clear()
+        # The terminal server may have closed the idle connection: the first
+        # send would still succeed and the commands would be silently lost
+        if self._sock is not None and self._peer_closed():
+            self.close()
+        view = memoryview(data)
+        for retry in (True, False):
+            self.open()
+            try:
+                while view:
+                    view = view[self._sock.send(view):]
+                return
+            except OSError:
+                self.close()
+                # Reconnect once, only if nothing was sent (resending part
+                # of the commands could apply them twice)
+                if not retry or len(view) != len(data):
+                    raise
+
+    def _peer_closed(self):
+        """Whether the peer closed (or reset) the connection"""
+        try:
+            readable, _, _ = select.select([self._sock], [], [], 0)
+            if not readable:
+                return False
+            self._sock.setblocking(False)
+            try:
+                return not self._sock.recv(1, socket.MSG_PEEK)
+            finally:
+                self._sock.settimeout(self.timeout)
+        except BlockingIOError:
+            return False
+        except OSError:
+            return True
+
+    def readline(self):
+        """
+        Read up to (and including) the next newline.
+
+        Raises :class:`TimeoutError` if the newline is not received within
+        the timeout. The connection is then closed so that a late reply can
+        never be taken as the answer to a later query.
+        """
+        self.flush()
+        self.open()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            pos = self._rbuf.find(b"\n")
+            if pos >= 0:
+                line = bytes(self._rbuf[:pos + 1])
+                del self._rbuf[:pos + 1]
+                return line
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._sock.settimeout(remaining)
+            try:
+                data = self._sock.recv(4096)
+            except socket.timeout:
+                break
+            except OSError:
+                self._rbuf.clear()
+                self.close()
+                raise
+            if not data:
+                self.close()
+                raise ConnectionError("{} closed by peer".format(self))
+            self._rbuf += self._filter_telnet(data) if self.telnet else data
+        self._rbuf.clear()
+        self.close()
+        raise TimeoutError(
+            "{} no reply within {}s".format(self, self.timeout))
+
+    def _filter_telnet(self, data):
+        """Strip telnet commands from data, refusing any option negotiation"""
+        buf = self._telnet_buf
+        buf += data
+        result = bytearray()
+        replies = bytearray()
+        i, n = 0, len(buf)
+        while i < n:
+            byte = buf[i]
+            if byte != IAC:
+                result.append(byte)
+                i += 1
+                continue
+            if i + 1 >= n:
+                break
+            command = buf[i + 1]
+            if command == IAC:
+                result.append(IAC)
+                i += 2
+            elif command in (DO, DONT, WILL, WONT):
+                if i + 2 >= n:
+                    break
+                if command == DO:
+                    replies += bytes((IAC, WONT, buf[i + 2]))
+                elif command == WILL:
+                    replies += bytes((IAC, DONT, buf[i + 2]))
+                i += 3
+            elif command == SB:
+                end = buf.find(bytes((IAC, SE)), i + 2)
+                if end < 0:
+                    break
+                i = end + 2
+            else:
+                i += 2
+        del buf[:i]
+        if replies:
+            self._sock.sendall(bytes(replies))
+        return result
+
+
+def serial_for_url(url, *args, **kwargs):
+    """
+    Create a connection for the given URL.
+
+    ``tcp://host:port`` and ``rfc2217://host:port`` are served by
+    :class:`TCP`, which only accepts its own keyword arguments (the serial
+    settings are configured on the terminal server). Any other URL is
+    handled by :func:`serial.serial_for_url`.
+    """
+    url_result = urllib.parse.urlparse(url)
+    scheme = url_result.scheme.lower()
+    if scheme in ("tcp", "rfc2217"):
+        if args:
+            raise TypeError(
+                "serial settings are not supported for {!r}: configure them "
+                "on the terminal server".format(url))
+        return TCP(url_result.hostname, url_result.port,
+                   telnet=scheme == "rfc2217", **kwargs)
+    return serial.serial_for_url(url, *args, **kwargs)
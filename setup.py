@@ -52,6 +52,7 @@ setup(
     entry_points={
         'console_scripts': [
             'Meadowlark_d5020=meadowlark_d5020.tango.server:main [tango]',
+            'Meadowlark_d5020_asyncio=meadowlark_d5020.tango.server:main_asyncio [tango]',
         ],
     },
     install_requires=requirements,
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+
+"""Tests for `meadowlark_d5020.aio` module."""
+
+import asyncio
+
+import pytest
+
+from meadowlark_d5020 import core
+from meadowlark_d5020.aio import Meadowlark_d5020
+
+
+def run(coroutine):
+    """Run the coroutine in a new event loop (asyncio.run needs python 3.7)"""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+class FakeConnection:
+    """Records the writes and answers the queries with canned replies."""
+
+    def __init__(self, replies=()):
+        self.writes = []
+        self.replies = list(replies)
+
+    async def write(self, data):
+        self.writes.append(data)
+
+    async def write_readlines(self, data, n):
+        self.writes.append(data)
+        replies, self.replies = self.replies[:n], self.replies[n:]
+        return replies
+
+
+def test_set_single_command():
+    conn = FakeConnection()
+    channel = Meadowlark_d5020(3, conn)
+    run(channel.set(waveform=core.Waveform.invariant, v1=20000))
+    assert conn.writes == [b"inv:3,10000\n"]
+    assert channel.state["v1"] == 10000
+    assert core.Meadowlark_d5020._conn is None
+
+
+def test_read_single_transaction():
+    conn = FakeConnection([b"39321\n", b"42942\n"])
+    channel = Meadowlark_d5020(2, conn)
+    values = run(
+        channel.read("period", "lc_temperature", "temperature_setpoint"))
+    assert conn.writes == [b"tmp:2,?\ntsp:2,?\n"]
+    assert values["period"] == 1000
+    assert values["lc_temperature"] == pytest.approx(26.85, abs=0.01)
+    assert values["temperature_setpoint"] == pytest.approx(54.48, abs=0.01)
+
+
+def test_set_rejected_keeps_state():
+    conn = FakeConnection()
+    channel = Meadowlark_d5020(1, conn)
+    with pytest.raises(ValueError):
+        run(channel.set(v1=500, waveform=99))
+    assert conn.writes == []
+    assert channel.state["v1"] == 0
+
+
+def test_journal_key_per_controller(tmp_path):
+    from meadowlark_d5020.journal import Journal
+
+    journal = Journal(str(tmp_path / "d5020.json"))
+    channel_a = Meadowlark_d5020(
+        1, FakeConnection(), journal=journal, journal_key="tcp://a:1:1")
+    channel_b = Meadowlark_d5020(
+        1, FakeConnection(), journal=journal, journal_key="tcp://b:1:1")
+    run(channel_a.set(v1=100))
+    run(channel_b.set(v1=200))
+    assert journal.get("tcp://a:1:1")["v1"] == 100
+    assert journal.get("tcp://b:1:1")["v1"] == 200
@@ -22,3 +22,209 @@ def test_content(response):
     """Sample pytest test function with the pytest fixture as an argument."""
     # from bs4 import BeautifulSoup
     # assert 'GitHub' in BeautifulSoup(response.content).title.string
+
+
+class FakeConnection:
+    """Records the writes and answers the queries with canned replies."""
+
+    def __init__(self, replies=()):
+        self.writes = []
+        self.replies = list(replies)
+
+    def write(self, data):
+        self.writes.append(data)
+
+    def flush(self):
+        pass
+
+    def reset_input_buffer(self):
+        pass
+
+    def readline(self):
+        return self.replies.pop(0)
+
+
+@pytest.fixture
+def channel():
+    conn = FakeConnection()
+    core.Meadowlark_d5020._conn = None
+    yield core.Meadowlark_d5020(1, conn)
+    core.Meadowlark_d5020._conn = None
+
+
+def test_read_single_transaction(channel):
+    channel._conn.replies = [b"39321\n", b"42942\n"]
+    values = channel.read("v2", "lc_temperature", "temperature_setpoint")
+    assert channel._conn.writes == [b"tmp:1,?\ntsp:1,?\n"]
+    assert values["v2"] == 1000
+    assert values["lc_temperature"] == pytest.approx(26.85, abs=0.01)
+    assert values["temperature_setpoint"] == pytest.approx(54.48, abs=0.01)
+
+
+def test_read_cached_only(channel):
+    assert channel.read("v1", "period") == {"v1": 0, "period": 1000}
+    assert channel._conn.writes == []
+
+
+def test_journal_warm_restart(tmp_path):
+    from meadowlark_d5020.journal import Journal
+
+    path = str(tmp_path / "d5020.json")
+    conn = FakeConnection()
+    core.Meadowlark_d5020._conn = None
+    channel = core.Meadowlark_d5020(2, conn, journal=Journal(path))
+    channel.waveform = core.Waveform.sinusoid
+    channel.v2 = 2500
+    writes = len(conn.writes)
+
+    # A new process restores the cache without talking to the hardware
+    core.Meadowlark_d5020._conn = None
+    restarted = core.Meadowlark_d5020(2, conn, journal=Journal(path))
+    core.Meadowlark_d5020._conn = None
+    assert len(conn.writes) == writes
+    assert restarted.waveform == core.Waveform.sinusoid.value
+    assert restarted.v2 == 2500
+    assert restarted.state == channel.state
+
+
+def test_controller_single_transaction():
+    conn = FakeConnection([b"39321\n", b"39321\n", b"39321\n"])
+    controller = core.Controller(conn, channels=(1, 2, 3))
+
+    controller.write("v1", [100, 200, 20000])
+    assert conn.writes == [
+        b"inv:1,100\ninv:2,200\ninv:3,10000\n"]
+
+    values = controller.read("v1", "lc_temperature")
+    assert conn.writes[1:] == [b"tmp:1,?\ntmp:2,?\ntmp:3,?\n"]
+    assert values["v1"] == [100, 200, 10000]
+    assert values["lc_temperature"] == pytest.approx([26.85] * 3, abs=0.01)
+
+    with pytest.raises(ValueError):
+        controller.write("v2", [1, 2])
+    with pytest.raises(ValueError):
+        controller.write("waveform", [1, 99, 2])
+    assert [channel.waveform for channel in controller.channels] == [0] * 3
+    assert core.Meadowlark_d5020._conn is None
+
+
+def test_controllers_use_own_connection():
+    conn_a, conn_b = FakeConnection(), FakeConnection()
+    controller_a = core.Controller(conn_a, channels=(1, 2))
+    controller_b = core.Controller(conn_b, channels=(1, 2))
+    controller_b.write("v1", [5, 6])
+    controller_a.write("v1", [7, 8])
+    assert conn_a.writes == [b"inv:1,7\ninv:2,8\n"]
+    assert conn_b.writes == [b"inv:1,5\ninv:2,6\n"]
+
+
+def test_controller_numpy_values_journaled(tmp_path):
+    numpy = pytest.importorskip("numpy")
+    from meadowlark_d5020.journal import Journal
+
+    path = str(tmp_path / "d5020.json")
+    journal = Journal(path)
+    controller_a = core.Controller(
+        FakeConnection(), channels=(1, 2), journal=journal, name="tcp://a:1")
+    controller_b = core.Controller(
+        FakeConnection(), channels=(1, 2), journal=journal, name="tcp://b:1")
+    controller_a.write("v2", numpy.array([100, 200], dtype=numpy.int32))
+    controller_b.write("v2", numpy.array([300, 400], dtype=numpy.int32))
+
+    restarted = core.Controller(
+        FakeConnection(), channels=(1, 2), journal=Journal(path),
+        name="tcp://a:1")
+    assert [channel.v2 for channel in restarted.channels] == [100, 200]
+
+
+def test_journal_failed_dump_is_retried(tmp_path, monkeypatch):
+    from meadowlark_d5020 import journal as journal_module
+
+    path = str(tmp_path / "d5020.json")
+    journal = journal_module.Journal(path)
+
+    def fail(*args, **kwargs):
+        raise OSError("no space left on device")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(journal_module.os, "fsync", fail)
+        with pytest.raises(OSError):
+            journal.commit({1: {"v1": 5}})
+    assert journal.get(1) is None
+    assert [entry for entry in tmp_path.iterdir()
+            if entry.suffix != ".lock"] == []
+
+    journal.commit({1: {"v1": 5}})
+    assert journal_module.Journal(path).get(1) == {"v1": 5}
+
+
+def test_failed_send_not_journaled(channel, tmp_path):
+    from meadowlark_d5020.journal import Journal
+
+    channel._journal = journal = Journal(str(tmp_path / "d5020.json"))
+
+    def broken(data):
+        raise OSError("connection lost")
+
+    channel._conn.write, write = broken, channel._conn.write
+    with pytest.raises(OSError):
+        channel.v1 = 5000
+    with pytest.raises(ValueError):
+        channel.waveform = 99
+    assert channel.v1 == 0 and channel.waveform == 0
+
+    channel._conn.write = write
+    channel.period = 2000
+    assert journal.get(1)["v1"] == 0
+    assert journal.get(1)["period"] == 2000
+
+
+def test_journal_shared_between_processes(tmp_path):
+    from meadowlark_d5020.journal import Journal
+
+    path = str(tmp_path / "d5020.json")
+    # two processes with the file opened before any commit
+    journal_a, journal_b = Journal(path), Journal(path)
+    journal_a.commit({"tcp://a:1:1": {"v1": 1}})
+    journal_b.commit({"tcp://b:1:1": {"v1": 2}})
+    journal = Journal(path)
+    assert journal.get("tcp://a:1:1") == {"v1": 1}
+    assert journal.get("tcp://b:1:1") == {"v1": 2}
+
+
+def test_journal_invalid_entries_ignored(tmp_path):
+    from meadowlark_d5020.journal import Journal
+
+    path = tmp_path / "d5020.json"
+    path.write_text('{"1": "x", "2": {"waveform": 99}, "3": {"v1": 5}}')
+    journal = Journal(str(path))
+    assert journal.get(1) is None
+    conn = FakeConnection()
+    channels = [core.Meadowlark_d5020(n, conn, journal=journal)
+                for n in (1, 2, 3)]
+    core.Meadowlark_d5020._conn = None
+    assert [channel.state["waveform"] for channel in channels] == [0, 0, 0]
+    assert channels[1].command() == "inv:2,0\n"
+    assert channels[2].v1 == 5
+
+
+def test_controller_failed_send_restores_state():
+    conn = FakeConnection()
+    controller = core.Controller(conn, channels=(1, 2))
+
+    def broken(data):
+        raise OSError("connection lost")
+
+    conn.write = broken
+    with pytest.raises(OSError):
+        controller.write("v2", [7, 8])
+    assert controller.read("v2") == {"v2": [1000, 1000]}
+
+
+def test_controller_without_channels():
+    conn = FakeConnection()
+    controller = core.Controller(conn, channels=())
+    assert controller.read("v1", "lc_temperature") == {
+        "v1": [], "lc_temperature": []}
+    controller.write("v1", [])
+    assert conn.writes == []
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+
+"""Tests for `meadowlark_d5020.simulator` module."""
+
+import pytest
+
+pytest.importorskip("sinstruments")
+
+from meadowlark_d5020 import core, simulator  # noqa: E402
+
+
+def test_replies_identify_channel():
+    device = simulator.Meadowlark_d5020("d5020")
+    for number in (1, 2):
+        reply = device.handle_message("tmp:{},?\n".format(number).encode())
+        assert core.raw_to_celsius(reply) == pytest.approx(
+            simulator.temperature(number), abs=0.01)
+    assert device.handle_message(b"tsp:3,42000.5\n") is None
+    assert device.handle_message(b"tsp:3,?\n") == b"42000\n"
+    assert device.handle_message(b"sin:3,0,1000,1000,0,0\n") is None
+
+
+def test_malformed_commands_ignored():
+    device = simulator.Meadowlark_d5020("d5020")
+    for message in (b"*IDN?\n", b"\n", b"tmp:\n", b"tmp:1\n"):
+        assert device.handle_message(message) is None
+
+
+def test_temperatures_never_overlap():
+    channels = range(simulator.MAX_CHANNEL + 1)
+    temperatures = {simulator.temperature(n) for n in channels}
+    setpoints = {simulator.temperature_setpoint(n) for n in channels}
+    assert len(temperatures) == len(setpoints) == len(channels)
+    assert max(temperatures) < min(setpoints)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+"""Tests for `meadowlark_d5020.transport` module."""
+
+import socket
+import time
+
+import pytest
+
+from meadowlark_d5020.transport import TCP, serial_for_url
+
+
+@pytest.fixture
+def server():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    sock.listen(1)
+    sock.settimeout(2)
+    yield sock
+    sock.close()
+
+
+def test_serial_for_url_tcp():
+    conn = serial_for_url("rfc2217://moxa:4001")
+    assert isinstance(conn, TCP)
+    assert (conn.host, conn.port, conn.telnet) == ("moxa", 4001, True)
+    assert not conn.is_open
+
+
+def test_writes_coalesced_until_readline(server):
+    conn = TCP(*server.getsockname())
+    conn.write(b"tmp:1,?\n")
+    conn.write(b"tsp:1,?\n")
+    assert not conn.is_open
+    conn.open()
+    client, _ = server.accept()
+    client.sendall(b"100\n200\n")
+    assert conn.readline() == b"100\n"
+    assert conn.readline() == b"200\n"
+    assert client.recv(100) == b"tmp:1,?\ntsp:1,?\n"
+    assert conn._sock.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+    conn.close()
+    client.close()
+
+
+def test_telnet_negotiation_refused(server):
+    conn = TCP(*server.getsockname(), telnet=True)
+    conn.open()
+    client, _ = server.accept()
+    # IAC DO 44 (COM-PORT-OPTION), IAC WILL 1 (ECHO), IAC IAC inside the data
+    client.sendall(b"\xff\xfd\x2c12\xff\xfb\x013\xff\xff\n")
+    assert conn.readline() == b"123\xff\n"
+    assert client.recv(100) == b"\xff\xfc\x2c\xff\xfe\x01"
+    conn.close()
+    client.close()
+
+
+def test_serial_settings_rejected():
+    with pytest.raises(TypeError):
+        serial_for_url("tcp://moxa:4001", 9600)
+    with pytest.raises(TypeError):
+        serial_for_url("tcp://moxa:4001", baudrate=9600)
+
+
+def test_timeout_drops_late_reply(server):
+    conn = TCP(*server.getsockname(), timeout=0.1)
+    conn.open()
+    client, _ = server.accept()
+    conn.write(b"tmp:1,?\n")
+    with pytest.raises(TimeoutError):
+        conn.readline()
+    assert not conn.is_open
+    # the late reply of channel 1 is lost with the old connection
+    client.sendall(b"100\n")
+    conn.write(b"tmp:2,?\n")
+    conn.flush()
+    client2, _ = server.accept()
+    client2.sendall(b"200\n")
+    assert conn.readline() == b"200\n"
+    conn.close()
+    client.close()
+    client2.close()
+
+
+def test_reconnect_when_peer_closed_idle_connection(server):
+    conn = TCP(*server.getsockname())
+    conn.open()
+    client, _ = server.accept()
+    client.close()
+    time.sleep(0.05)
+    conn.write(b"inv:1,200\n")
+    conn.flush()
+    client, _ = server.accept()
+    assert client.recv(100) == b"inv:1,200\n"
+    conn.close()
+    client.close()
@@ -0,0 +1,226 @@
+"""
+Concurrency stress and soak test of shared-port access.
+
+Drives a Meadowlark D5020 simulator from several processes, each one with
+several threads sharing a single connection (as the Tango server does).
+Every thread mixes setters, tmp/tsp queries and sync commands on random
+channels and checks that each reply matches the channel it queried.
+
+Start the simulator (tcp transport on port 5000) and run the test:
+
+    $ sinstruments-server -c sinstruments.yml
+    $ python utils/stress.py --url tcp://localhost:5000 \\
+          --processes 4 --threads 8 --duration 7200
+
+Every interval a line with throughput, latency percentiles, reply
+mismatches and memory (RSS of all processes) is printed. The exit code is
+non zero if any reply mismatch or error was found.
+"""
+
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import sys
+import threading
+import time
+
+from meadowlark_d5020.core import Meadowlark_d5020
+from meadowlark_d5020.simulated import (
+    MAX_CHANNEL, temperature, temperature_setpoint)
+from meadowlark_d5020.transport import serial_for_url
+
+# Resolution of the temperature raw value (ºC)
+TOLERANCE = 500 / 65535
+
+
+def rss():
+    """Current resident memory of the process (bytes)"""
+    try:
+        with open("/proc/self/statm") as fobj:
+            return int(fobj.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak memory (kilobytes on linux) if /proc is not available
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Stats:
+    """Latencies and failures recorded by the threads of a process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.latencies = []
+        self.mismatches = 0
+        self.errors = 0
+        self.last_error = None
+
+    def swap(self):
+        with self.lock:
+            result = (self.latencies, self.mismatches, self.errors,
+                      self.last_error)
+            self.reset()
+        return result
+
+
+def check(value, expected):
+    return abs(value - expected) <= TOLERANCE
+
+
+def operation(channel):
+    """Run a random operation on the channel. Returns False on mismatch"""
+    number = channel.number
+    choice = random.random()
+    if choice < 0.3:
+        channel.v1 = random.randint(Meadowlark_d5020.MIN_VOLTAGE,
+                                    Meadowlark_d5020.MAX_VOLTAGE)
+    elif choice < 0.4:
+        # always the same setpoint per channel so any reply can be checked
+        channel.temperature_setpoint = temperature_setpoint(number)
+    elif choice < 0.5:
+        channel.sync(random.randint(0, Meadowlark_d5020.MAX_PHASE), 100)
+    elif choice < 0.7:
+        return check(channel.lc_temperature, temperature(number))
+    elif choice < 0.8:
+        return check(channel.temperature_setpoint,
+                     temperature_setpoint(number))
+    else:
+        values = channel.read("lc_temperature", "temperature_setpoint")
+        return (check(values["lc_temperature"], temperature(number)) and
+                check(values["temperature_setpoint"],
+                      temperature_setpoint(number)))
+    return True
+
+
+def worker_thread(channels, stats, stop):
+    while not stop.is_set():
+        channel = random.choice(channels)
+        start = time.perf_counter()
+        try:
+            ok = operation(channel)
+        except Exception as error:
+            ok = None
+            last_error = repr(error)
+        latency = time.perf_counter() - start
+        with stats.lock:
+            stats.latencies.append(latency)
+            if ok is None:
+                stats.errors += 1
+                stats.last_error = last_error
+            elif not ok:
+                stats.mismatches += 1
+
+
+def worker_process(url, channels, threads, duration, interval, results):
+    conn = serial_for_url(url)
+    Meadowlark_d5020._conn = None
+    channels = [Meadowlark_d5020(number, conn) for number in channels]
+    stats, stop = Stats(), threading.Event()
+    workers = [
+        threading.Thread(target=worker_thread, args=(channels, stats, stop),
+                         daemon=True)
+        for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    # one sample per interval: (index, seconds, latencies, mismatches,
+    # errors, last error, rss)
+    start = time.monotonic()
+    for index in range(1, int(duration // interval) + 1):
+        time.sleep(max(start + index * interval - time.monotonic(), 0))
+        results.put((index, interval, *stats.swap(), rss()))
+    stop.set()
+    for worker in workers:
+        worker.join()
+    results.put(None)
+
+
+def percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def report(index, samples, first_rss):
+    interval = samples[0][1]
+    latencies = sorted(lat for sample in samples for lat in sample[2])
+    mismatches = sum(sample[3] for sample in samples)
+    errors = sum(sample[4] for sample in samples)
+    memory = sum(sample[6] for sample in samples)
+    if latencies:
+        p50, p99, p999 = (percentile(latencies, f) * 1e3
+                          for f in (0.5, 0.99, 0.999))
+        lmax = latencies[-1] * 1e3
+    else:
+        p50 = p99 = p999 = lmax = float("nan")
+    print("{:8.0f}s {:9.1f} op/s  p50 {:7.3f}ms  p99 {:7.3f}ms  "
+          "p99.9 {:7.3f}ms  max {:8.3f}ms  mismatch {:d}  error {:d}  "
+          "rss {:7.1f}MB ({:+.1f}MB)".format(
+              index * interval, len(latencies) / interval,
+              p50, p99, p999, lmax, mismatches, errors, memory / 2**20,
+              (memory - first_rss) / 2**20), flush=True)
+    for sample in samples:
+        if sample[5] is not None:
+            print("          last error: {}".format(sample[5]), flush=True)
+    return mismatches, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", default="tcp://localhost:5000")
+    parser.add_argument("--channels", default="1,2,3,4",
+                        type=lambda text: [int(i) for i in text.split(",")])
+    parser.add_argument("--processes", default=2, type=int)
+    parser.add_argument("--threads", default=4, type=int,
+                        help="threads per process")
+    parser.add_argument("--duration", default=60, type=float,
+                        help="seconds (rounded down to whole intervals)")
+    parser.add_argument("--interval", default=10, type=float,
+                        help="report interval (seconds)")
+    args = parser.parse_args()
+    if not all(0 <= number <= MAX_CHANNEL for number in args.channels):
+        parser.error("channels must be in 0..{}".format(MAX_CHANNEL))
+
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(
+            target=worker_process,
+            args=(args.url, args.channels, args.threads, args.duration,
+                  args.interval, results))
+        for _ in range(args.processes)]
+    for process in processes:
+        process.start()
+
+    # report an interval once all processes delivered their sample
+    first_rss = None
+    running = len(processes)
+    total_mismatches = total_errors = 0
+    intervals = {}
+    while running:
+        try:
+            sample = results.get(timeout=args.interval + 5)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                break
+            continue
+        if sample is None:
+            running -= 1
+            continue
+        samples = intervals.setdefault(sample[0], [])
+        samples.append(sample)
+        if len(samples) == len(processes):
+            del intervals[sample[0]]
+            if first_rss is None:
+                first_rss = sum(sample[6] for sample in samples)
+            mismatches, errors = report(sample[0], samples, first_rss)
+            total_mismatches += mismatches
+            total_errors += errors
+    for process in processes:
+        process.join()
+    print("total: mismatch {} error {}".format(total_mismatches, total_errors))
+    return 1 if total_mismatches or total_errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())